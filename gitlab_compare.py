@@ -2,7 +2,9 @@
 """
 GitLab repositories lister and comparer for two instances.
 
-Requires: python-gitlab (pip install python-gitlab)
+Requires: httpx[http2] (pip install -r requirements.txt)
+Optional: orjson (faster JSON parsing/serialization; stdlib json is used otherwise)
+          python-gitlab (validates each token once before the crawl; projects are always read via the REST API)
 
 Usage examples:
   # Save combined report to JSON file (with pagination logs to stderr)
@@ -36,30 +38,67 @@ Outputs are only written to files:
   - <prefix>_common.json/.csv: projects present in both GitLabs (matched by path)
 
 Pagination & resilience:
-- The tool explicitly paginates through all projects (default per-page=100), logs each page, and retries transient errors (500/502/503/504/429) with exponential backoff.
+- The tool explicitly paginates through all projects (default per-page=100), logs each page, and retries transient errors (500/502/503/504/429) with jittered exponential backoff
+  or the server's Retry-After (delay-seconds or HTTP date); every wait is capped at 60 s.
+- Both GitLab instances are fetched concurrently (asyncio + httpx), so total time is bounded by the slower instance.
+- One HTTP/2 keep-alive client per instance: concurrent page requests are multiplexed over a few connections.
+- Page 1 is requested first; its X-Total-Pages header lets pages 2..N be fetched concurrently (--concurrency, default 16).
+  When GitLab omits the header (more than 10,000 projects) the tool falls back to keyset pagination, following the Link header.
+- --pagination keyset uses keyset pagination from the first page: sequential, but each page costs the server the same
+  regardless of its position (recommended for very large instances).
+- --simple requests GitLab's simple project representation (much smaller pages); it has no 'visibility', so that column stays empty.
+
+JSON files are written compact by default; pass --pretty for indented output.
 
 Each project entry includes: name, group (namespace), path (path_with_namespace), web_url, id, visibility
 """
 from __future__ import annotations
 
 import argparse
+import asyncio
 import csv
 import json
+import logging
 import os
+import random
 import sys
-from typing import Dict, Iterable, List, Tuple, Optional
-import time
-from datetime import datetime
-import urllib3
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Mapping, Tuple, Type, Optional, TextIO
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import partial
+from operator import attrgetter
 
 try:
-    import gitlab  # type: ignore
+    import gitlab
+except ImportError:  # optional: only used to validate the tokens up front
+    gitlab = None  # type: ignore
+
+try:
+    import httpx
 except Exception as e:
-    print("Error: python-gitlab is required. Install with: pip install python-gitlab", file=sys.stderr)
+    print("Error: httpx is required. Install with: pip install 'httpx[http2]'", file=sys.stderr)
     raise
 
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used as fallback
+    orjson = None  # type: ignore
+
+_json_loads: Callable[[bytes], Any] = orjson.loads if orjson is not None else json.loads
+
+# Empty tuples catch nothing, so main() can list these unconditionally
+_GITLAB_AUTH_ERRORS: Tuple[Type[BaseException], ...] = ()
+_GITLAB_ERRORS: Tuple[Type[BaseException], ...] = ()
+if gitlab is not None:
+    _GITLAB_AUTH_ERRORS = (gitlab.GitlabAuthenticationError,)
+    _GITLAB_ERRORS = (gitlab.GitlabError,)
+
 
 def connect(url: str, token: str, verify_ssl: bool = True) -> "gitlab.Gitlab":
+    import urllib3  # installed with python-gitlab (via requests)
     gl = gitlab.Gitlab(url=url, private_token=token, ssl_verify=verify_ssl, per_page=100)
     urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
     # Validate connection
@@ -67,221 +106,455 @@ def connect(url: str, token: str, verify_ssl: bool = True) -> "gitlab.Gitlab":
     return gl
 
 
-# Nota: a paginação explícita é implementada em fetch_projects com logs e retentativas.
+# Nota: a paginação explícita é implementada em fetch_projects_async com logs e retentativas.
 
 
-def normalize_project(p) -> Dict[str, str]:
-    # Namespace/group extraction: try namespace.full_path then name
-    namespace = None
-    try:
-        ns = getattr(p, 'namespace', None) or {}
-        namespace = ns.get('full_path') or ns.get('name') or ns.get('path')
-    except Exception:
-        namespace = None
+essential_fields = ["id", "name", "group", "path", "web_url", "visibility"]
 
-    path = getattr(p, 'path_with_namespace', None) or getattr(p, 'path', None)
-    name = getattr(p, 'name', None) or (path.split('/')[-1] if isinstance(path, str) else None)
-    web_url = getattr(p, 'web_url', None)
-    visibility = getattr(p, 'visibility', None)
-    pid = getattr(p, 'id', None)
 
-    return {
-        'id': str(pid) if pid is not None else '',
-        'name': name or '',
-        'group': namespace or '',
-        'path': path or '',
-        'web_url': web_url or '',
-        'visibility': visibility or '',
-    }
+# Slotted records (no per-instance __dict__) matter when tens of thousands of projects are held for both
+# instances. dataclass(slots=True) needs Python 3.10; a hand-written __slots__ would break the mypyc build
+# (the slot descriptors are read as field defaults), so older interpreters get a plain dataclass.
+# mypyc compiles the first branch into a native class, which has no __dict__ either.
+if sys.version_info >= (3, 10):
+    _dataclass_options: Dict[str, bool] = {'slots': True}
+else:
+    _dataclass_options = {}
 
 
-class _Logger:
-    def __init__(self, log_file: Optional[str] = None):
-        self.log_file = log_file
-        if self.log_file:
-            dir_name = os.path.dirname(self.log_file)
-            if dir_name:
-                os.makedirs(dir_name, exist_ok=True)
+@dataclass(**_dataclass_options)
+class Project:
+    id: str
+    name: str
+    group: str
+    path: str
+    web_url: str
+    visibility: str
 
-    def log(self, msg: str) -> None:
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        line = f"[{timestamp}] {msg}\n"
-        # stderr for immediate feedback
-        try:
-            sys.stderr.write(line)
-            sys.stderr.flush()
-        except Exception:
-            pass
-        # optional file
-        if self.log_file:
+
+ProjectList = List[Project]
+CommonPairs = List[Tuple[Project, Project]]
+
+
+def normalize_project(d: Dict[str, Any]) -> Project:
+    # d is the raw JSON object returned by /api/v4/projects (plain dict, no python-gitlab wrapping)
+    # Namespace/group extraction: try namespace.full_path then name
+    ns = d.get('namespace') or {}
+    path = d.get('path_with_namespace') or d.get('path') or ''
+    pid = d.get('id')
+
+    return Project(
+        id=str(pid) if pid is not None else '',
+        name=d.get('name') or path.rsplit('/', 1)[-1],
+        # group and visibility repeat across many projects: intern them so all records share one str object.
+        # path and web_url are unique per project, interning them would only grow the intern table.
+        group=sys.intern(ns.get('full_path') or ns.get('name') or ns.get('path') or ''),
+        path=path,
+        web_url=d.get('web_url') or '',
+        visibility=sys.intern(d.get('visibility') or ''),
+    )
+
+
+log = logging.getLogger('gitlab_compare')
+
+
+def setup_logging(log_file: Optional[str] = None, verbose: bool = False) -> None:
+    # Handlers are opened once; per-request messages are DEBUG so they cost nothing unless --verbose
+    handlers: List[logging.Handler] = [logging.StreamHandler(sys.stderr)]
+    if log_file:
+        dir_name = os.path.dirname(log_file)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+        handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
+    # Root stays at INFO so other libraries' debug output (asyncio, urllib3, ...) never leaks in;
+    # --verbose only lowers our own logger
+    logging.basicConfig(
+        level=logging.INFO,
+        format='[%(asctime)s] %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S',
+        handlers=handlers,
+    )
+    log.setLevel(logging.DEBUG if verbose else logging.INFO)
+    # httpx/httpcore log every request at INFO/DEBUG; our own page messages already cover that
+    for name in ('httpx', 'httpcore', 'hpack'):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+
+TRANSIENT_STATUS_CODES = {429, 500, 502, 503, 504}
+# Explicit rather than relying on client defaults: /projects JSON compresses 5-10x.
+# 'br' is not listed because httpx can only decode it when the optional brotli package is installed.
+HTTP_HEADERS_ENCODING = {'Accept-Encoding': 'gzip, deflate'}
+HTTP_TIMEOUT = 60.0  # seconds; large pages on busy instances can exceed httpx's 5 s default
+MAX_RETRY_SLEEP = 60.0  # seconds; caps both our backoff and the server's Retry-After
+
+
+def _retry_delay(response: Optional["httpx.Response"], attempt: int, retry_backoff: float) -> float:
+    # Honor Retry-After (seconds or HTTP date, sent by GitLab on 429) and fall back to exponential backoff.
+    # Jitter keeps the concurrent page fetches of both instances from retrying in lockstep.
+    retry_after = (response.headers.get('Retry-After') or '').strip() if response is not None else ''
+    if retry_after:
+        delay: Optional[float] = None
+        if retry_after.isascii() and retry_after.isdigit():
+            # RFC 9110 delay-seconds: digits only (float() would also accept 'inf', 'nan', '1e9')
+            delay = int(retry_after)
+        else:
             try:
-                with open(self.log_file, 'a', encoding='utf-8') as f:
-                    f.write(line)
-            except Exception:
-                pass
+                delay = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                delay = None
+        if delay is not None:
+            # Jitter only upwards so we don't retry before the server-requested cool-down, but still cap it:
+            # a huge or bogus value (e.g. from a proxy) must not stall the crawl; retrying early costs one attempt
+            return min(MAX_RETRY_SLEEP, max(0.0, delay) * random.uniform(1.0, 1.2))
+    return min(MAX_RETRY_SLEEP, retry_backoff ** attempt * random.uniform(0.8, 1.2))
+
+
+async def _get_page(client: "httpx.AsyncClient", url: str, request_url: str, params: Optional[Dict[str, Any]],
+                    label: str, max_retries: int, retry_backoff: float) -> Tuple[List[Dict[str, Any]], Mapping[str, str], Optional[str]]:
+    """GET one page of projects, retrying transient errors.
+
+    Returns the decoded items, the response headers and the URL of the next page
+    (from the Link header, used by keyset pagination) if any.
+    """
+    attempt = 0
+    while True:
+        try:
+            log.debug("[%s] Solicitando %s", url, label)
+            resp = await client.get(request_url, params=params)
+            resp.raise_for_status()
+            page_items = _json_loads(resp.content)
+            next_url = resp.links.get('next', {}).get('url')
+            return page_items, resp.headers, next_url
+        except Exception as e:
+            # httpx.HTTPStatusError carries the response (and its status code)
+            response = getattr(e, 'response', None)
+            response_code = getattr(response, 'status_code', None)
+            transient = response_code in TRANSIENT_STATUS_CODES
+            if not transient or attempt >= max_retries:
+                log.error("[%s] Falha ao obter %s: %s (código=%s). Não será tentado novamente.", url, label, e, response_code)
+                raise
+            attempt += 1
+            sleep_for = _retry_delay(response, attempt, retry_backoff)
+            log.warning("[%s] Erro transitório (código=%s) ao obter %s. Tentativa %d/%d. Aguardando %.1fs...",
+                        url, response_code, label, attempt, max_retries, sleep_for)
+            await asyncio.sleep(sleep_for)
+
+
+async def _fetch_keyset(client: "httpx.AsyncClient", url: str, api_url: str, base_params: Dict[str, Any],
+                        max_retries: int, retry_backoff: float) -> ProjectList:
+    """Walk /projects with keyset pagination, following the Link rel="next" chain.
+
+    Each page costs the server O(per_page) regardless of its position, unlike
+    offset pagination; the trade-off is that pages can only be fetched in sequence.
+    """
+    projects: ProjectList = []
+    request_url = api_url
+    params: Optional[Dict[str, Any]] = {**base_params, 'pagination': 'keyset'}
+    page = 1
+    while True:
+        page_items, headers, next_url = await _get_page(
+            client, url, request_url, params,
+            f"página {page} keyset (per_page={base_params['per_page']})", max_retries, retry_backoff,
+        )
+        if page == 1:
+            log.info("[%s] Content-Encoding das respostas: %s", url, headers.get('Content-Encoding') or 'nenhum')
+        projects.extend(normalize_project(p) for p in page_items)
+        log.info("[%s] Página %d retornou %d projetos. Acumulado: %d", url, page, len(page_items), len(projects))
+        if not next_url or not page_items:
+            return projects
+        # The next link already carries every query parameter (including the cursor)
+        request_url, params = next_url, None
+        page += 1
+
+
+PAGINATION_MODES = ('auto', 'keyset')
 
 
-def fetch_projects(url: str, token: str, verify_ssl: bool,
-                   per_page: int = 100,
-                   max_retries: int = 5,
-                   retry_backoff: float = 1.5,
-                   logger: Optional[_Logger] = None) -> List[Dict[str, str]]:
-    gl = connect(url, token, verify_ssl)
-    projects: List[Dict[str, str]] = []
+async def fetch_projects_async(url: str, token: str, verify_ssl: bool,
+                               per_page: int = 100,
+                               max_retries: int = 5,
+                               retry_backoff: float = 1.5,
+                               concurrency: int = 16,
+                               simple: bool = False,
+                               pagination: str = 'auto') -> ProjectList:
+    if gitlab is not None:
+        # Validate the token with python-gitlab without blocking the event loop (the other instance keeps going)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, connect, url, token, verify_ssl)
+    projects: ProjectList = []
 
     # Cap per_page to 100 (GitLab API maximum)
     if per_page > 100:
         per_page = 100
     if per_page <= 0:
         per_page = 100
-
-    page = 1
-    total = 0
-    while True:
-        attempt = 0
-        while True:
-            try:
-                if logger:
-                    logger.log(f"Solicitando página {page} (per_page={per_page})")
-                page_items = gl.projects.list(page=page, per_page=per_page)
-                break
-            except Exception as e:
-                # Try to inspect python-gitlab error codes
-                response_code = getattr(e, 'response_code', None)
-                transient = response_code in {429, 500, 502, 503, 504}
-                if not transient or attempt >= max_retries:
-                    if logger:
-                        logger.log(f"Falha ao obter página {page}: {e} (código={response_code}). Não será tentado novamente.")
-                    raise
-                attempt += 1
-                sleep_for = retry_backoff ** attempt
-                if logger:
-                    logger.log(f"Erro transitório (código={response_code}) ao obter página {page}. Tentativa {attempt}/{max_retries}. Aguardando {sleep_for:.1f}s...")
-                time.sleep(sleep_for)
-
-        if not page_items:
-            if logger:
-                logger.log(f"Página {page} vazia. Concluído. Total de projetos: {total}")
-            break
-
-        normalized = [normalize_project(p) for p in page_items]
-        projects.extend(normalized)
-        total += len(normalized)
-        if logger:
-            logger.log(f"Página {page} retornou {len(normalized)} projetos. Acumulado: {total}")
-        page += 1
-
+    if concurrency <= 0:
+        concurrency = 1
+
+    api_url = f"{url.rstrip('/')}/api/v4/projects"
+    # Stable ordering keeps concurrent offset pages consistent; simple=true is GitLab's own projection
+    # (much smaller payload) but it omits 'visibility', so it is opt-in
+    base_params: Dict[str, Any] = {'per_page': per_page, 'order_by': 'id', 'sort': 'asc'}
+    if simple:
+        base_params['simple'] = 'true'
+    # One keep-alive client per instance; with HTTP/2 the concurrent pages share a couple of TCP/TLS connections
+    limits = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+    async with httpx.AsyncClient(headers={'PRIVATE-TOKEN': token, **HTTP_HEADERS_ENCODING}, verify=verify_ssl, http2=True,
+                                 limits=limits, timeout=HTTP_TIMEOUT) as client:
+        if pagination == 'keyset':
+            projects = await _fetch_keyset(client, url, api_url, base_params, max_retries, retry_backoff)
+        else:
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def fetch_page(page: int) -> Tuple[int, List[Dict[str, Any]]]:
+                async with semaphore:
+                    page_items, _, _ = await _get_page(
+                        client, url, api_url, {**base_params, 'page': page},
+                        f"página {page} (per_page={per_page})", max_retries, retry_backoff,
+                    )
+                log.info("[%s] Página %d retornou %d projetos.", url, page, len(page_items))
+                return page, page_items
+
+            # Page 1 tells us how many pages there are, so the rest can be requested concurrently
+            first_items, headers, _ = await _get_page(
+                client, url, api_url, {**base_params, 'page': 1},
+                f"página 1 (per_page={per_page})", max_retries, retry_backoff,
+            )
+            total_pages = (headers.get('X-Total-Pages') or '').strip()
+            log.info("[%s] Content-Encoding das respostas: %s", url, headers.get('Content-Encoding') or 'nenhum')
+
+            if total_pages.isdigit():
+                log.info("[%s] Página 1 retornou %d projetos. Total de páginas: %s", url, len(first_items), total_pages)
+                page_count = max(int(total_pages), 1)  # an empty instance reports 0 pages
+                tasks = [asyncio.create_task(fetch_page(i)) for i in range(2, page_count + 1)]
+                # Normalize each page as soon as it arrives, overlapping the CPU work with the requests
+                # still in flight; results are slotted by page number so the output order stays stable
+                pages: List[ProjectList] = [[] for _ in range(page_count)]
+                try:
+                    pages[0] = [normalize_project(p) for p in first_items]
+                    for next_done in asyncio.as_completed(tasks):
+                        page, page_items = await next_done
+                        pages[page - 1] = [normalize_project(p) for p in page_items]
+                finally:
+                    for task in tasks:
+                        task.cancel()  # no-op for finished tasks; stops the rest if a page failed
+                for page_projects in pages:
+                    projects.extend(page_projects)
+            else:
+                # GitLab omits X-Total-Pages above 10,000 records
+                log.info("[%s] Cabeçalho X-Total-Pages ausente; usando paginação keyset.", url)
+                projects = await _fetch_keyset(client, url, api_url, base_params, max_retries, retry_backoff)
+
+    log.info("[%s] Concluído. Total de projetos: %d", url, len(projects))
     return projects
 
 
-def compare_by_path(list1: List[Dict[str, str]], list2: List[Dict[str, str]]) -> List[Tuple[Dict[str, str], Dict[str, str]]]:
-    index2 = {p['path']: p for p in list2 if p.get('path')}
-    commons = []
-    for p1 in list1:
-        path = p1.get('path')
-        if path and path in index2:
-            commons.append((p1, index2[path]))
+def compare_by_path(list1: ProjectList, list2: ProjectList) -> CommonPairs:
+    # Index the smaller list (less transient memory) and probe with the other one;
+    # pairs are always returned as (gitlab1, gitlab2), ordered by the probing list
+    swap = len(list1) < len(list2)
+    indexed, probe = (list1, list2) if swap else (list2, list1)
+    index = {p.path: p for p in indexed if p.path}
+    commons: CommonPairs = []
+    for p in probe:
+        match = index.get(p.path)  # empty paths are never indexed
+        if match is not None:
+            commons.append((match, p) if swap else (p, match))
     return commons
 
 
-def build_combined_json(list1, list2, commons):
+def iter_commons_payload(commons: CommonPairs) -> Iterator[Dict[str, object]]:
+    # A generator function rather than a generator expression: mypyc would turn the latter into a list
+    for a, b in commons:
+        yield {'path': a.path, 'gitlab1': a, 'gitlab2': b}
+
+
+def build_commons_payload(commons: CommonPairs) -> List[Dict[str, object]]:
+    return list(iter_commons_payload(commons))
+
+
+def build_combined_json(list1: ProjectList, list2: ProjectList, commons_payload: List[Dict[str, object]]) -> Dict[str, object]:
     return {
         'list1': list1,
         'list2': list2,
-        'common_by_path': [
-            {
-                'path': a['path'],
-                'gitlab1': a,
-                'gitlab2': b,
-            }
-            for (a, b) in commons
-        ],
+        'common_by_path': commons_payload,
         'summary': {
             'count_list1': len(list1),
             'count_list2': len(list2),
-            'count_common_by_path': len(commons),
+            'count_common_by_path': len(commons_payload),
         }
     }
 
 
-def write_output_json_to_file(filepath: str, list1, list2, commons) -> None:
-    payload = build_combined_json(list1, list2, commons)
-    dir_name = os.path.dirname(filepath)
-    if dir_name:
-        os.makedirs(dir_name, exist_ok=True)
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
-
-
-def write_output_csv_to_file(filepath: str, list1, list2, commons) -> None:
-    dir_name = os.path.dirname(filepath)
-    if dir_name:
-        os.makedirs(dir_name, exist_ok=True)
-    with open(filepath, 'w', encoding='utf-8', newline='') as out_stream:
-        writer = csv.writer(out_stream)
-        writer.writerow(["SECTION", "id", "name", "group", "path", "web_url", "visibility", "origin"])  # origin: 1 or 2
-        for p in list1:
-            writer.writerow(["LIST", p['id'], p['name'], p['group'], p['path'], p['web_url'], p['visibility'], "1"]) 
-        for p in list2:
-            writer.writerow(["LIST", p['id'], p['name'], p['group'], p['path'], p['web_url'], p['visibility'], "2"]) 
-        writer.writerow([])
-        writer.writerow(["COMMON_BY_PATH", "id_1", "name_1", "group_1", "path", "web_url_1", "visibility_1", "id_2", "name_2", "group_2", "web_url_2", "visibility_2"]) 
-        for a, b in commons:
-            writer.writerow(["COMMON_BY_PATH", a['id'], a['name'], a['group'], a['path'], a['web_url'], a['visibility'], b['id'], b['name'], b['group'], b['web_url'], b['visibility']])
+OUTPUT_BUFFER_SIZE = 1 << 20  # 1 MiB: fewer write syscalls on large reports
 
 
-def _ensure_prefix_dir(prefix: str) -> None:
-    dir_name = os.path.dirname(prefix)
+def _ensure_parent_dir(path: str) -> None:
+    dir_name = os.path.dirname(path)
     if dir_name and not os.path.exists(dir_name):
         os.makedirs(dir_name, exist_ok=True)
 
 
-def write_separate_json(prefix: str, list1, list2, commons) -> None:
-    _ensure_prefix_dir(prefix)
-    with open(f"{prefix}_gitlab1.json", "w", encoding="utf-8") as f:
-        json.dump(list1, f, ensure_ascii=False, indent=2)
-    with open(f"{prefix}_gitlab2.json", "w", encoding="utf-8") as f:
-        json.dump(list2, f, ensure_ascii=False, indent=2)
-    # For commons, output an array of objects with gitlab1/gitlab2 and path
-    commons_payload = [
-        {"path": a.get("path", ""), "gitlab1": a, "gitlab2": b}
-        for (a, b) in commons
-    ]
-    with open(f"{prefix}_common.json", "w", encoding="utf-8") as f:
-        json.dump(commons_payload, f, ensure_ascii=False, indent=2)
-
-
-essential_fields = ["id", "name", "group", "path", "web_url", "visibility"]
-
-
-def write_separate_csv(prefix: str, list1, list2, commons) -> None:
-    _ensure_prefix_dir(prefix)
-    # GitLab 1 list
-    with open(f"{prefix}_gitlab1.csv", "w", encoding="utf-8", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(essential_fields)
-        for p in list1:
-            writer.writerow([p.get(k, "") for k in essential_fields])
-    # GitLab 2 list
-    with open(f"{prefix}_gitlab2.csv", "w", encoding="utf-8", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(essential_fields)
-        for p in list2:
-            writer.writerow([p.get(k, "") for k in essential_fields])
-    # Commons
-    with open(f"{prefix}_common.csv", "w", encoding="utf-8", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["path"] + [f"1_{k}" for k in essential_fields] + [f"2_{k}" for k in essential_fields])
+def _json_default(o: object) -> Dict[str, str]:
+    # stdlib json does not know dataclasses; orjson serializes them natively
+    if isinstance(o, Project):
+        return {k: getattr(o, k) for k in essential_fields}
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _write_json(filepath: str, payload: object, pretty: bool = False) -> None:
+    # orjson (if installed) is several times faster and emits UTF-8 bytes directly
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        with open(filepath, 'wb', buffering=OUTPUT_BUFFER_SIZE) as f:
+            f.write(orjson.dumps(payload, option=option))
+        return
+    # Compact separators by default; indentation roughly doubles the output size
+    with open(filepath, 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE) as f:
+        if pretty:
+            json.dump(payload, f, ensure_ascii=False, indent=2, default=_json_default)
+        else:
+            json.dump(payload, f, ensure_ascii=False, separators=(',', ':'), default=_json_default)
+
+
+def _dumps_compact(obj: object) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=_json_default).encode('utf-8')
+
+
+def _write_json_array(f: BinaryIO, items: Iterable[object]) -> None:
+    # One record at a time: memory stays O(record) instead of O(whole array)
+    f.write(b'[')
+    first = True
+    for item in items:
+        if not first:
+            f.write(b',')
+        f.write(_dumps_compact(item))
+        first = False
+    f.write(b']')
+
+
+def _open_json(filepath: str) -> BinaryIO:
+    return open(filepath, 'wb', buffering=OUTPUT_BUFFER_SIZE)
+
+
+def write_output_json_streaming(filepath: str, list1: ProjectList, list2: ProjectList, commons: CommonPairs) -> None:
+    """Write the combined report incrementally, producing the same compact JSON as build_combined_json."""
+    with _open_json(filepath) as f:
+        f.write(b'{"list1":')
+        _write_json_array(f, list1)
+        f.write(b',"list2":')
+        _write_json_array(f, list2)
+        f.write(b',"common_by_path":')
+        _write_json_array(f, iter_commons_payload(commons))
+        f.write(b',"summary":')
+        f.write(_dumps_compact({
+            'count_list1': len(list1),
+            'count_list2': len(list2),
+            'count_common_by_path': len(commons),
+        }))
+        f.write(b'}')
+
+
+def _open_csv(filepath: str) -> TextIO:
+    return open(filepath, 'w', encoding='utf-8', newline='', buffering=OUTPUT_BUFFER_SIZE)
+
+
+# C-implemented row builders: one call per project instead of one attribute load per field
+_project_row = attrgetter(*essential_fields)
+_project_row_without_path = attrgetter(*tuple(k for k in essential_fields if k != "path"))
+
+
+def write_json_reports(list1: ProjectList, list2: ProjectList, commons: CommonPairs, out_json: Optional[str] = None,
+                       json_prefix: Optional[str] = None, pretty: bool = False) -> None:
+    if not pretty:
+        # Compact output is streamed record by record, so peak memory does not grow with the report
+        if out_json:
+            _ensure_parent_dir(out_json)
+            write_output_json_streaming(out_json, list1, list2, commons)
+        if json_prefix:
+            _ensure_parent_dir(json_prefix)
+            with _open_json(f"{json_prefix}_gitlab1.json") as f:
+                _write_json_array(f, list1)
+            with _open_json(f"{json_prefix}_gitlab2.json") as f:
+                _write_json_array(f, list2)
+            # For commons, output an array of objects with gitlab1/gitlab2 and path
+            with _open_json(f"{json_prefix}_common.json") as f:
+                _write_json_array(f, iter_commons_payload(commons))
+        return
+
+    # Indented output is built in memory; the commons payload is shared by the combined and the separate reports
+    commons_payload = build_commons_payload(commons)
+    if out_json:
+        _ensure_parent_dir(out_json)
+        _write_json(out_json, build_combined_json(list1, list2, commons_payload), pretty)
+    if json_prefix:
+        _ensure_parent_dir(json_prefix)
+        _write_json(f"{json_prefix}_gitlab1.json", list1, pretty)
+        _write_json(f"{json_prefix}_gitlab2.json", list2, pretty)
+        # For commons, output an array of objects with gitlab1/gitlab2 and path
+        _write_json(f"{json_prefix}_common.json", commons_payload, pretty)
+
+
+def write_csv_reports(list1: ProjectList, list2: ProjectList, commons: CommonPairs, out_csv: Optional[str] = None,
+                      csv_prefix: Optional[str] = None) -> None:
+    # Every sink is opened up front so each list is walked once, whatever the number of outputs
+    with ExitStack() as stack:
+        combined = sep1 = sep2 = sep_common = None
+        if out_csv:
+            _ensure_parent_dir(out_csv)
+            combined = csv.writer(stack.enter_context(_open_csv(out_csv)))
+            combined.writerow(["SECTION", "id", "name", "group", "path", "web_url", "visibility", "origin"])  # origin: 1 or 2
+        if csv_prefix:
+            _ensure_parent_dir(csv_prefix)
+            sep1 = csv.writer(stack.enter_context(_open_csv(f"{csv_prefix}_gitlab1.csv")))
+            sep2 = csv.writer(stack.enter_context(_open_csv(f"{csv_prefix}_gitlab2.csv")))
+            sep_common = csv.writer(stack.enter_context(_open_csv(f"{csv_prefix}_common.csv")))
+            sep1.writerow(essential_fields)
+            sep2.writerow(essential_fields)
+            sep_common.writerow(["path"] + [f"1_{k}" for k in essential_fields] + [f"2_{k}" for k in essential_fields])
+
+        for origin, projects, sep in (("1", list1, sep1), ("2", list2, sep2)):
+            for p in projects:
+                row = _project_row(p)
+                if combined:
+                    combined.writerow(("LIST",) + row + (origin,))
+                if sep:
+                    sep.writerow(row)
+
+        if combined:
+            combined.writerow([])
+            combined.writerow(["COMMON_BY_PATH", "id_1", "name_1", "group_1", "path", "web_url_1", "visibility_1", "id_2", "name_2", "group_2", "web_url_2", "visibility_2"])
         for a, b in commons:
-            writer.writerow([
-                a.get("path", ""),
-                a.get("id", ""), a.get("name", ""), a.get("group", ""), a.get("path", ""), a.get("web_url", ""), a.get("visibility", ""),
-                b.get("id", ""), b.get("name", ""), b.get("group", ""), b.get("path", ""), b.get("web_url", ""), b.get("visibility", ""),
-            ])
-
-
-def parse_args(argv: List[str]) -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description="Lista e compara projetos entre dois GitLabs usando python-gitlab")
+            if combined:
+                combined.writerow(("COMMON_BY_PATH",) + _project_row(a) + _project_row_without_path(b))
+            if sep_common:
+                sep_common.writerow((a.path,) + _project_row(a) + _project_row(b))
+
+
+def write_all(list1: ProjectList, list2: ProjectList, commons: CommonPairs, *, out_json: Optional[str] = None, out_csv: Optional[str] = None,
+              json_prefix: Optional[str] = None, csv_prefix: Optional[str] = None, pretty: bool = False) -> None:
+    """Write every requested report (combined and/or separate, JSON and/or CSV)."""
+    jobs: List[Callable[[], None]] = []
+    if out_json or json_prefix:
+        jobs.append(partial(write_json_reports, list1, list2, commons,
+                            out_json=out_json, json_prefix=json_prefix, pretty=pretty))
+    if out_csv or csv_prefix:
+        jobs.append(partial(write_csv_reports, list1, list2, commons, out_csv=out_csv, csv_prefix=csv_prefix))
+    if len(jobs) <= 1:
+        for job in jobs:
+            job()
+        return
+    # File writes release the GIL, so the JSON and CSV writers overlap each other's disk latency
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = [pool.submit(job) for job in jobs]
+    for future in futures:
+        future.result()  # re-raise any writer error
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Lista e compara projetos entre dois GitLabs usando a API REST (/api/v4/projects)")
     parser.add_argument('--url1', required=False, default=os.getenv('GITLAB_URL_1'), help='URL do GitLab 1 (ou defina GITLAB_URL_1)')
     parser.add_argument('--token1', required=False, default=os.getenv('GITLAB_TOKEN_1'), help='Token privado para GitLab 1 (ou defina GITLAB_TOKEN_1)')
     parser.add_argument('--url2', required=False, default=os.getenv('GITLAB_URL_2'), help='URL do GitLab 2 (ou defina GITLAB_URL_2)')
@@ -291,10 +564,16 @@ def parse_args(argv: List[str]) -> argparse.Namespace:
     parser.add_argument('--per-page', type=int, default=100, help='Tamanho da página nas listagens (máximo 100)')
     parser.add_argument('--max-retries', type=int, default=5, help='Número máximo de tentativas para erros 5xx/429')
     parser.add_argument('--retry-backoff', type=float, default=1.5, help='Fator de backoff exponencial entre tentativas')
+    parser.add_argument('--concurrency', type=int, default=16, help='Número máximo de páginas buscadas em paralelo por GitLab')
+    parser.add_argument('--simple', action='store_true', help='Usa simple=true na API (resposta bem menor, mas sem o campo visibility)')
+    parser.add_argument('--pagination', choices=PAGINATION_MODES, default='auto',
+                        help='auto: páginas em paralelo via X-Total-Pages (keyset se o cabeçalho faltar); keyset: sempre keyset, sequencial')
+    parser.add_argument('--verbose', action='store_true', help='Loga também cada requisição de página (nível DEBUG)')
     parser.add_argument('--log-file', required=False, help='Arquivo de log para registrar paginação e tentativas (stderr por padrão)')
     # Combined report file outputs (choose one)
     parser.add_argument('--out-json', required=False, help='Arquivo para salvar o relatório combinado em JSON')
     parser.add_argument('--out-csv', required=False, help='Arquivo para salvar o relatório combinado em CSV')
+    parser.add_argument('--pretty', action='store_true', help='Gera JSON indentado (por padrão o JSON é compacto)')
     # Separate per-GitLab outputs
     parser.add_argument('--json-prefix', required=False, help='Se definido, gera arquivos JSON separados: <prefix>_gitlab1.json, <prefix>_gitlab2.json, <prefix>_common.json')
     parser.add_argument('--csv-prefix', required=False, help='Se definido, gera arquivos CSV separados: <prefix>_gitlab1.csv, <prefix>_gitlab2.csv, <prefix>_common.csv')
@@ -318,46 +597,58 @@ def parse_args(argv: List[str]) -> argparse.Namespace:
     return args
 
 
-def main(argv: List[str]) -> int:
+async def _gather(args: argparse.Namespace, verify_ssl: bool) -> Tuple[ProjectList, ProjectList]:
+    # Both crawls are I/O-bound, so running them concurrently roughly halves wall-clock time
+    list1, list2 = await asyncio.gather(
+        fetch_projects_async(
+            args.url1, args.token1, verify_ssl,
+            per_page=args.per_page, max_retries=args.max_retries,
+            retry_backoff=args.retry_backoff, concurrency=args.concurrency, simple=args.simple,
+            pagination=args.pagination,
+        ),
+        fetch_projects_async(
+            args.url2, args.token2, verify_ssl,
+            per_page=args.per_page, max_retries=args.max_retries,
+            retry_backoff=args.retry_backoff, concurrency=args.concurrency, simple=args.simple,
+            pagination=args.pagination,
+        ),
+    )
+    return list1, list2
+
+
+def main(argv: Optional[List[str]] = None) -> int:
     args = parse_args(argv)
     verify_ssl = not args.no_verify_ssl
 
-    logger = _Logger(args.log_file)
+    setup_logging(args.log_file, verbose=args.verbose)
 
     try:
-        list1 = fetch_projects(
-            args.url1, args.token1, verify_ssl,
-            per_page=args.per_page, max_retries=args.max_retries,
-            retry_backoff=args.retry_backoff, logger=logger,
-        )
-        list2 = fetch_projects(
-            args.url2, args.token2, verify_ssl,
-            per_page=args.per_page, max_retries=args.max_retries,
-            retry_backoff=args.retry_backoff, logger=logger,
-        )
-    except gitlab.GitlabAuthenticationError as e:  # type: ignore
+        list1, list2 = asyncio.run(_gather(args, verify_ssl))
+    except _GITLAB_AUTH_ERRORS as e:
         print(f"Erro de autenticação: {e}", file=sys.stderr)
         return 2
-    except gitlab.GitlabError as e:  # type: ignore
+    except _GITLAB_ERRORS as e:
         print(f"Erro do GitLab: {e}", file=sys.stderr)
         return 3
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 401:
+            print(f"Erro de autenticação: token inválido para {e.request.url.host}", file=sys.stderr)
+            return 2
+        print(f"Erro do GitLab: {e.response.status_code} {e.response.reason_phrase} ({e.request.url})", file=sys.stderr)
+        return 3
     except Exception as e:
         print(f"Erro inesperado: {e}", file=sys.stderr)
         return 1
 
     commons = compare_by_path(list1, list2)
 
-    # Combined report outputs to files (no stdout data)
-    if getattr(args, 'out_json', None):
-        write_output_json_to_file(args.out_json, list1, list2, commons)
-    if getattr(args, 'out_csv', None):
-        write_output_csv_to_file(args.out_csv, list1, list2, commons)
-
-    # Optionally generate separate files per GitLab and the common set
-    if getattr(args, 'json_prefix', None):
-        write_separate_json(args.json_prefix, list1, list2, commons)
-    if getattr(args, 'csv_prefix', None):
-        write_separate_csv(args.csv_prefix, list1, list2, commons)
+    # Combined and/or separate reports, written to files only (no stdout data)
+    write_all(
+        list1, list2, commons,
+        out_json=args.out_json, out_csv=args.out_csv,
+        json_prefix=args.json_prefix, csv_prefix=args.csv_prefix,
+        pretty=args.pretty,
+    )
 
     return 0
 
@@ -0,0 +1,32 @@
+"""Optional packaging for gitlab_compare.
+
+Installing with mypyc available compiles the module ahead of time to a C
+extension (normalize_project, compare_by_path and the writers are the hot
+per-project paths). Without mypyc the pure-Python module is installed.
+
+    pip install mypy
+    python setup.py build_ext --inplace   # builds gitlab_compare.*.so next to the .py
+"""
+from setuptools import setup
+
+try:
+    from mypyc.build import mypycify
+except ImportError:
+    ext_modules = []
+else:
+    ext_modules = mypycify(['gitlab_compare.py'])
+
+setup(
+    name='relatorio-gitlab',
+    version='0.1.0',
+    description='Lista e compara projetos entre dois GitLabs',
+    py_modules=['gitlab_compare'],
+    ext_modules=ext_modules,
+    python_requires='>=3.8',
+    install_requires=['httpx[http2]>=0.24,<1'],
+    extras_require={
+        'fast': ['orjson>=3.9'],
+        'auth': ['python-gitlab>=4.3.0,<5'],
+    },
+    entry_points={'console_scripts': ['gitlab-compare=gitlab_compare:main']},
+)